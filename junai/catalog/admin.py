@@ -1,11 +1,18 @@
 from django.contrib import admin
 
 # Register your models here.
-from catalog.models import ToolList, AnalysisModel
+from catalog.models import ToolList, AnalysisModel, LDAJob, UploadedCSV
 
 @admin.register(ToolList)
 class ToolListAdmin(admin.ModelAdmin):
 	pass
 @admin.register(AnalysisModel)
 class AnalysisModel(admin.ModelAdmin):
-	pass
\ No newline at end of file
+	pass
+@admin.register(LDAJob)
+class LDAJobAdmin(admin.ModelAdmin):
+	list_display = ('id', 'tool', 'status', 'batch_id', 'created')
+	list_filter = ('status',)
+@admin.register(UploadedCSV)
+class UploadedCSVAdmin(admin.ModelAdmin):
+	list_display = ('content_hash', 'openai_file_id', 'created')
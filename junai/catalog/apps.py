@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
 
 
 class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'catalog'
+
+    def ready(self):
+        # 프로세스 시작(ready) 시점이 아니라 워커별 첫 요청 때 커넥션을 엶
+        # (--preload 마스터/관리 명령에서는 소켓을 만들지 않음)
+        if getattr(settings, 'OPENAI_WARMUP', False):
+            from catalog.services.lda import warmup_openai
+            request_started.connect(warmup_openai, dispatch_uid='catalog-openai-warmup')
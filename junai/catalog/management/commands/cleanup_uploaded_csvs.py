@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from catalog.models import UploadedCSV
+from catalog.services.lda import _client
+
+
+class Command(BaseCommand):
+    help = "보관 기간이 지난 업로드 CSV 캐시를 정리하고 OpenAI Files에서도 삭제합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=30,
+            help="이 일수보다 오래된 캐시를 삭제합니다. 기본 30일(OpenAI 보관 기간).",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        client = _client()
+        deleted = 0
+        for row in UploadedCSV.objects.filter(created__lt=cutoff):
+            try:
+                client.files.delete(row.openai_file_id)
+            except Exception as e:
+                # 이미 만료/삭제된 파일이어도 캐시 행은 지운다
+                self.stderr.write(f"{row.openai_file_id} 삭제 실패: {e}")
+            row.delete()
+            deleted += 1
+        self.stdout.write(self.style.SUCCESS(f"{deleted}개 캐시 삭제"))
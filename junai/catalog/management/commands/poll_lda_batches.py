@@ -0,0 +1,144 @@
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from catalog.models import LDAJob
+from catalog.services.lda import LDABatchFailed, collect_lda_batch, run_lda_from_csv
+
+
+# 작업이 아니라 설정(API 키/권한) 문제이거나 일시적인 4xx
+_AUTH_STATUSES = {401, 403}
+_RETRYABLE_4XX = _AUTH_STATUSES | {408, 429}
+
+
+def _status_code(e):
+    # httpx.HTTPStatusError, openai.APIStatusError 모두 .response.status_code 보유
+    return getattr(getattr(e, "response", None), "status_code", None)
+
+
+def _is_permanent_http_error(e):
+    """4xx 응답은 다시 시도해도 같은 결과이므로 실패로 확정. (인증/권한, 408, 429는 제외)"""
+    status = _status_code(e)
+    return isinstance(status, int) and 400 <= status < 500 and status not in _RETRYABLE_4XX
+
+
+def _is_config_error(e):
+    """API 키 누락/만료·교체는 모든 작업에 똑같이 실패하므로 작업을 실패 처리하지 않고 실행을 중단."""
+    return isinstance(e, ImproperlyConfigured) or _status_code(e) in _AUTH_STATUSES
+
+
+class Command(BaseCommand):
+    help = (
+        "대기 중인 로컬 LDA 작업(batch_id 없음)을 실행하고, "
+        "LDA batch 작업 상태를 조회해 완료된 작업의 결과 파일을 내려받습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="한 번만 확인하지 않고 interval 초마다 계속 확인합니다.",
+        )
+        parser.add_argument(
+            "--interval", type=int, default=60,
+            help="--loop 사용 시 확인 간격(초). 기본 60초.",
+        )
+        parser.add_argument(
+            "--max-age-hours", type=int, default=48,
+            help="제출 후 이 시간이 지나도 끝나지 않은 작업은 실패 처리합니다. 기본 48시간(24h window + 여유).",
+        )
+        parser.add_argument(
+            "--local-timeout-minutes", type=int, default=60,
+            help="로컬 실행을 시작한 뒤 이 시간이 지나도 끝나지 않은 작업(실행 중 프로세스 종료 등)은 실패 처리합니다. 기본 60분.",
+        )
+
+    def handle(self, *args, **options):
+        self.max_age_hours = options["max_age_hours"]
+        self.max_age = timedelta(hours=self.max_age_hours)
+        self.local_timeout = timedelta(minutes=options["local_timeout_minutes"])
+        while True:
+            self.poll_once()
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+    def fail(self, job, message):
+        job.status = LDAJob.STATUS_FAILED
+        job.answer_text = f"[오류] {message}"
+        job.save(update_fields=["status", "answer_text", "updated"])
+        self.stderr.write(f"job {job.pk} 실패: {message}")
+
+    def poll_once(self):
+        self.run_local_jobs()
+        self.collect_batches()
+
+    def run_local_jobs(self):
+        # 실행 도중 프로세스가 죽어 running에 남은 작업 정리
+        stale = LDAJob.objects.filter(
+            status=LDAJob.STATUS_RUNNING, updated__lt=timezone.now() - self.local_timeout,
+        )
+        for job in stale:
+            self.fail(job, "로컬 LDA 실행이 제한 시간 안에 끝나지 않았습니다.")
+
+        jobs = LDAJob.objects.filter(status=LDAJob.STATUS_PENDING, batch_id="").order_by("created")
+        for job in jobs:
+            # cron과 --loop 등 여러 프로세스가 같은 작업을 실행하지 않도록 먼저 running으로 선점
+            claimed = LDAJob.objects.filter(pk=job.pk, status=LDAJob.STATUS_PENDING, batch_id="").update(
+                status=LDAJob.STATUS_RUNNING, updated=timezone.now(),
+            )
+            if not claimed:
+                continue
+
+            job_dir = Path(settings.MEDIA_ROOT) / job.job_rel_dir
+            try:
+                res = run_lda_from_csv(
+                    Path(settings.MEDIA_ROOT) / job.input_relpath, job_dir,
+                    extra_instruction=job.extra_instruction,
+                )
+            except Exception as e:
+                if _is_config_error(e):
+                    LDAJob.objects.filter(pk=job.pk).update(status=LDAJob.STATUS_PENDING)
+                    raise CommandError(f"OpenAI 설정/인증 오류로 실행을 중단합니다: {e}") from e
+                self.fail(job, e)
+                continue
+            self.complete(job, res)
+
+    def complete(self, job, res):
+        job.status = LDAJob.STATUS_COMPLETED
+        job.answer_text = res.answer_text
+        job.saved_relpaths = res.saved_relpaths
+        job.save(update_fields=["status", "answer_text", "saved_relpaths", "updated"])
+        self.stdout.write(self.style.SUCCESS(f"job {job.pk} 완료 ({len(res.saved_relpaths)} files)"))
+
+    def collect_batches(self):
+        jobs = LDAJob.objects.filter(status=LDAJob.STATUS_PENDING).exclude(batch_id="")
+        for job in jobs:
+            job_dir = Path(settings.MEDIA_ROOT) / job.job_rel_dir
+            try:
+                res = collect_lda_batch(job.batch_id, job_dir)
+            except LDABatchFailed as e:
+                self.fail(job, e)
+                continue
+            except Exception as e:
+                if _is_config_error(e):
+                    # 대기 중인 batch는 키를 고친 뒤 그대로 수집할 수 있으므로 작업 상태는 건드리지 않음
+                    raise CommandError(f"OpenAI 설정/인증 오류로 확인을 중단합니다: {e}") from e
+                if _is_permanent_http_error(e):
+                    # 예: 컨테이너 만료 후 파일 다운로드 404
+                    self.fail(job, e)
+                elif timezone.now() - job.created > self.max_age:
+                    self.fail(job, f"{self.max_age_hours}시간이 지나도 결과를 받지 못했습니다. 마지막 오류: {e}")
+                else:
+                    # 네트워크 오류 등은 다음 확인 때 다시 시도
+                    self.stderr.write(f"job {job.pk} 확인 실패(재시도 예정): {e}")
+                continue
+
+            if res is None:
+                if timezone.now() - job.created > self.max_age:
+                    self.fail(job, f"{self.max_age_hours}시간이 지나도 batch가 끝나지 않았습니다.")
+                continue
+            self.complete(job, res)
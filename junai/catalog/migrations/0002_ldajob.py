@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-15 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LDAJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.CharField(blank=True, max_length=200)),
+                ('job_rel_dir', models.CharField(help_text='MEDIA_ROOT 기준 작업 디렉터리', max_length=500)),
+                ('uploaded_filename', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('answer_text', models.TextField(blank=True)),
+                ('saved_relpaths', models.JSONField(blank=True, default=list)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('tool', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lda_jobs', to='catalog.toollist')),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-15 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_ldajob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadedCSV',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('openai_file_id', models.CharField(max_length=200)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
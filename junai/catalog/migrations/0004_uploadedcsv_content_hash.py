@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-15 11:00
+
+from django.db import migrations, models
+
+
+def prefix_sha256(apps, schema_editor):
+    UploadedCSV = apps.get_model('catalog', 'UploadedCSV')
+    for row in UploadedCSV.objects.exclude(content_hash__contains=':'):
+        row.content_hash = f'sha256:{row.content_hash}'
+        row.save(update_fields=['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_uploadedcsv'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='uploadedcsv',
+            old_name='sha256',
+            new_name='content_hash',
+        ),
+        migrations.AlterField(
+            model_name='uploadedcsv',
+            name='content_hash',
+            field=models.CharField(help_text='"<알고리즘>:<hex digest>" 형식', max_length=80, unique=True),
+        ),
+        migrations.RunPython(prefix_sha256, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_uploadedcsv_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ldajob',
+            name='extra_instruction',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='ldajob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.urls import reverse
+from django.utils.text import get_valid_filename
 
 # Create your models here.
 class ToolList(models.Model):
@@ -17,4 +18,56 @@ class AnalysisModel(models.Model):
 	description = models.TextField(max_length=1000, help_text='Enter a brief description of the model')
 
 	def __str__(self):
-		return self.name
\ No newline at end of file
+		return self.name
+
+class LDAJob(models.Model):
+	"""LDA 작업. batch_id가 있으면 OpenAI Batch API, 비어 있으면 poll_lda_batches가 로컬 gensim으로 실행"""
+	STATUS_PENDING = 'pending'
+	STATUS_RUNNING = 'running'
+	STATUS_COMPLETED = 'completed'
+	STATUS_FAILED = 'failed'
+	STATUS_CHOICES = [
+		(STATUS_PENDING, 'Pending'),
+		(STATUS_RUNNING, 'Running'),
+		(STATUS_COMPLETED, 'Completed'),
+		(STATUS_FAILED, 'Failed'),
+	]
+
+	tool = models.ForeignKey('ToolList', on_delete=models.CASCADE, related_name='lda_jobs')
+	batch_id = models.CharField(max_length=200, blank=True)
+	job_rel_dir = models.CharField(max_length=500, help_text='MEDIA_ROOT 기준 작업 디렉터리')
+	uploaded_filename = models.CharField(max_length=255, blank=True)
+	extra_instruction = models.TextField(blank=True)
+	status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+	answer_text = models.TextField(blank=True)
+	saved_relpaths = models.JSONField(default=list, blank=True)
+	created = models.DateTimeField(auto_now_add=True)
+	updated = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ['-created']
+
+	def __str__(self):
+		return f'{self.tool} / {self.job_rel_dir} ({self.status})'
+
+	def get_absolute_url(self):
+		return reverse('lda-job-detail', args=[str(self.tool_id), str(self.pk)])
+
+	@property
+	def is_pending(self):
+		return self.status in (self.STATUS_PENDING, self.STATUS_RUNNING)
+
+	@property
+	def input_relpath(self):
+		"""업로드한 CSV의 MEDIA_ROOT 기준 경로"""
+		return f'{self.job_rel_dir}/input_{get_valid_filename(self.uploaded_filename)}'
+
+
+class UploadedCSV(models.Model):
+	"""OpenAI Files API에 이미 올린 CSV (내용 해시 → file id)"""
+	content_hash = models.CharField(max_length=80, unique=True, help_text='"<알고리즘>:<hex digest>" 형식')
+	openai_file_id = models.CharField(max_length=200)
+	created = models.DateTimeField(auto_now_add=True)
+
+	def __str__(self):
+		return f'{self.content_hash[:19]} → {self.openai_file_id}'
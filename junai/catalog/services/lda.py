@@ -1,33 +1,115 @@
 # catalog/services/lda.py
 from __future__ import annotations
 
+import io
 import os
 import re
+import csv
+import itertools
 import json
+import hashlib
+import mmap
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
-from urllib.request import Request, urlopen
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import httpx
 from dotenv import load_dotenv
 from openai import OpenAI
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+try:  # 선택 의존성: pip install blake3
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:  # 선택 의존성: pip install ijson
+    import ijson
+except ImportError:
+    ijson = None
+
+try:  # 선택 의존성: pip install pyarrow
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pac
+except ImportError:
+    pa = pc = pac = None
+
+from catalog.models import UploadedCSV
+from catalog.services import lda_local
 
 # api.env 로드
 _ENV_PATH = Path(__file__).with_name("api.env")
 load_dotenv(_ENV_PATH)
 
 
-@lru_cache(maxsize=1)
+# 컨테이너 파일 동시 다운로드 수
+DOWNLOAD_WORKERS = 8
+
+
+# 커넥션 풀/클라이언트는 프로세스(PID)별로 만듭니다.
+# (gunicorn --preload 등으로 fork된 워커가 부모의 열린 소켓을 공유하면 keep-alive/HTTP2 스트림이 섞임)
+def _http() -> httpx.Client:
+    return _http_for_pid(os.getpid())
+
+
 def _client() -> OpenAI:
-    api_key = os.getenv("OPENAI_API_KEY") or getattr(settings, "OPENAI_API_KEY", None)
-    if not api_key:
-        raise RuntimeError(
-            "OPENAI_API_KEY가 설정되지 않았습니다. "
-            "catalog/services/api.env 또는 OS 환경변수 또는 settings.py를 확인하세요."
-        )
-    return OpenAI(api_key=api_key)
+    return _client_for_pid(os.getpid())
+
+
+@lru_cache(maxsize=1)
+def _http_for_pid(pid: int) -> httpx.Client:
+    """
+    OpenAI SDK와 컨테이너 파일 다운로드가 함께 쓰는 keep-alive 커넥션 풀.
+    h2 패키지가 있으면 HTTP/2로 한 커넥션에서 여러 요청을 동시에 보냅니다.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    return httpx.Client(
+        http2=http2,
+        timeout=180,
+        limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300),
+    )
+
+
+@lru_cache(maxsize=1)
+def _client_for_pid(pid: int) -> OpenAI:
+    return OpenAI(api_key=_api_key(), http_client=_http())
+
+
+_warmed_pid: Optional[int] = None
+_warmup_lock = threading.Lock()
+
+
+def warmup_openai(**kwargs) -> None:
+    """
+    이후 요청이 DNS/TLS 핸드셰이크 비용을 내지 않도록 가벼운 호출로 이 프로세스의 커넥션 풀을 미리 엽니다.
+    request_started 시그널 수신기로 연결되어 워커 프로세스마다 첫 요청 때 한 번만
+    백그라운드 스레드로 실행됩니다(관리 명령에서는 요청이 없으므로 실행되지 않음). 실패해도 무시.
+    """
+    global _warmed_pid
+    pid = os.getpid()
+    with _warmup_lock:
+        if _warmed_pid == pid:
+            return
+        _warmed_pid = pid
+    threading.Thread(target=_warmup, daemon=True).start()
+
+
+def _warmup() -> None:
+    try:
+        _client().models.retrieve("gpt-4o-mini")
+    except Exception:
+        pass
 
 
 @dataclass
@@ -53,126 +135,529 @@ BASE_LDA_PROMPT = """
    - topic_prevalence.png
    - topics.csv (topic_id, term, weight 상위 20)
    - doc_topic.csv (문서별 토픽 확률)
+   - 확률/가중치는 float16으로 변환 후 float_format="%.4f"로 저장(파일 크기 축소)
    - 가능하면 topic_terms_topic{i}.png (토픽별 상위 단어 막대그래프)
 5) 한국어로 (a) 최적 K (b) 토픽 요약(각 1줄)만 간단히 출력하라.
 시각화는 Matplotlib로 하고, 한글이 깨지거나 잘리지 않도록 (1) 사용 가능한 한글 폰트를 자동 탐색해 설정하고, (2) 모든 savefig에 bbox_inches="tight", pad_inches=0.2, dpi>=200, tight_layout()을 적용하라
 """.strip()
 
 
+def stream_answer(question: str, model: str = "gpt-4o-mini", max_tokens: int = 512) -> Iterator[str]:
+    """
+    짧은 질의응답용. stream=True로 받아 토큰 조각을 생성되는 즉시 yield 합니다.
+    (첫 토큰까지의 지연만 기다리면 되므로 체감 응답 속도가 빨라짐)
+    """
+    stream = _client().chat.completions.create(
+        model=model,
+        stream=True,
+        max_tokens=max_tokens,
+        messages=[
+            {"role": "system", "content": "너는 한국어로 간결하게 답하는 데이터 분석 도우미다."},
+            {"role": "user", "content": question},
+        ],
+    )
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
 def _safe_filename(name: str) -> str:
-    name = (name or "").strip()
-    name = Path(name).name  # 경로 제거
-    name = re.sub(r"[^A-Za-z0-9._-]+", "_", name)
-    return name or "output"
+    name = Path((name or "").strip()).name  # 경로 제거
+    return _UNSAFE_FILENAME_RE.sub("_", name) or "output"
+
+
+def _iter_container_file_citations(resp_dict: Dict[str, Any]) -> Iterator[Tuple[str, str, str]]:
+    for item in resp_dict.get("output") or ():
+        if item.get("type") != "message":
+            continue
+        for part in item.get("content") or ():
+            for ann in part.get("annotations") or ():
+                if ann.get("type") == "container_file_citation":
+                    yield ann["container_id"], ann["file_id"], ann.get("filename") or ann["file_id"]
 
 
 def _extract_container_file_citations(resp_dict: Dict[str, Any]) -> List[Dict[str, str]]:
     """
     code_interpreter 생성 파일은 message.content[*].annotations[*]에
     type=container_file_citation으로 포함됩니다.
+    (container_id, file_id) 기준으로 중복 제거(처음 나온 순서 유지).
     """
-    out: List[Dict[str, str]] = []
-    for item in resp_dict.get("output", []) or []:
-        if item.get("type") != "message":
-            continue
-        for part in item.get("content", []) or []:
-            for ann in part.get("annotations", []) or []:
-                if ann.get("type") == "container_file_citation":
-                    out.append({
-                        "container_id": ann["container_id"],
-                        "file_id": ann["file_id"],
-                        "filename": ann.get("filename", ann["file_id"]),
-                    })
-
-    # 중복 제거
-    seen = set()
-    uniq: List[Dict[str, str]] = []
-    for x in out:
-        k = (x["container_id"], x["file_id"])
-        if k in seen:
-            continue
-        seen.add(k)
-        uniq.append(x)
-    return uniq
+    uniq: Dict[Tuple[str, str], Dict[str, str]] = {}
+    for container_id, file_id, filename in _iter_container_file_citations(resp_dict):
+        uniq.setdefault((container_id, file_id), {
+            "container_id": container_id,
+            "file_id": file_id,
+            "filename": filename,
+        })
+    return list(uniq.values())
 
 
-def _download_container_file_bytes(api_key: str, container_id: str, file_id: str) -> bytes:
+def _download_container_file(api_key: str, container_id: str, file_id: str, out_path: Path) -> Path:
     """
     GET /v1/containers/{container_id}/files/{file_id}/content
     (Container Files API Reference) :contentReference[oaicite:2]{index=2}
+    응답 전체를 bytes로 모으지 않고 64KB 단위로 바로 out_path에 씁니다.
     """
     url = f"https://api.openai.com/v1/containers/{container_id}/files/{file_id}/content"
-    req = Request(url, headers={"Authorization": f"Bearer {api_key}"})
-    with urlopen(req, timeout=180) as r:
-        return r.read()
+    with _http().stream("GET", url, headers={"Authorization": f"Bearer {api_key}"}) as r:
+        r.raise_for_status()
+        with open(out_path, "wb", buffering=0) as fh:
+            for chunk in r.iter_bytes(65536):
+                fh.write(chunk)
+    return out_path
 
 
-def run_lda_from_csv(csv_path: Path, job_dir: Path, extra_instruction: str = "", model: str = "gpt-5") -> LDAJobResult:
+def _extract_output_text(resp_dict: Dict[str, Any]) -> str:
     """
-    views.py에서 호출하는 시그니처와 동일:
-      run_lda_from_csv(upload_path, job_dir, extra_instruction=extra)
+    Responses 원본 JSON(batch 결과 등)에는 SDK의 output_text 편의 속성이 없으므로
+    message.content[*] 중 output_text 조각을 직접 모읍니다.
+    """
+    if resp_dict.get("output_text"):
+        return resp_dict["output_text"]
+    texts: List[str] = []
+    for item in resp_dict.get("output", []) or []:
+        if item.get("type") != "message":
+            continue
+        for part in item.get("content", []) or []:
+            if part.get("type") == "output_text" and part.get("text"):
+                texts.append(part["text"])
+    return "\n".join(texts)
 
-    CSV는 input_file로 주입하지 말고,
-    code_interpreter container의 file_ids로 첨부해야 합니다. :contentReference[oaicite:3]{index=3}
+
+_OUTPUT_PARTS_PATH = "output.item.content.item"
+_SCALAR_EVENTS = {"null", "boolean", "integer", "double", "number", "string"}
+
+
+def _collect_json(raw: bytes, paths: Iterable[str]) -> Dict[str, List[Any]]:
     """
-    client = _client()
-    api_key = os.getenv("OPENAI_API_KEY") or getattr(settings, "OPENAI_API_KEY", None)
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다.")
+    JSON 원문을 한 번만 훑어 paths(ijson prefix 형식, 배열 원소는 "item") 위치의 값들을 모읍니다.
+    ijson이 있으면 ijson.parse 이벤트 한 번으로 필요한 서브트리만 dict로 만들고, 없으면 전체 파싱 후 같은 경로를 따라갑니다.
+    """
+    found: Dict[str, List[Any]] = {path: [] for path in paths}
+    if ijson is None:
+        root = json.loads(raw)
+        for path in found:
+            nodes = [root]
+            for key in path.split(".") if path else ():
+                if key == "item":
+                    nodes = [x for node in nodes if isinstance(node, list) for x in node]
+                else:
+                    nodes = [node[key] for node in nodes if isinstance(node, dict) and key in node]
+            found[path] = nodes
+        return found
+
+    builder = target = None
+    depth = 0
+    for prefix, event, value in ijson.parse(io.BytesIO(raw), use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+                if depth == 0:
+                    found[target].append(builder.value)
+                    builder = None
+        elif prefix in found:
+            if event in ("start_map", "start_array"):
+                builder, target, depth = ijson.ObjectBuilder(), prefix, 1
+                builder.event(event, value)
+            elif event in _SCALAR_EVENTS:
+                found[prefix].append(value)
+    return found
+
+
+def _slim_output(parts: Iterable[Any]) -> Dict[str, Any]:
+    """
+    message의 output_text 조각(텍스트 + annotations)만 남겨 _extract_output_text/_extract_container_file_citations가
+    읽는 모양으로 돌려줍니다. code_interpreter 실행 로그 등 나머지 트리는 dict로 만들지 않습니다.
+    """
+    return {"output": [{"type": "message", "content": [
+        part for part in parts if isinstance(part, dict) and part.get("type") == "output_text"
+    ]}]}
 
-    csv_path = Path(csv_path)
-    job_dir = Path(job_dir)
-    job_dir.mkdir(parents=True, exist_ok=True)
 
-    if not csv_path.exists():
-        raise FileNotFoundError(f"입력 CSV가 존재하지 않습니다: {csv_path}")
+def _slim_response(raw: bytes) -> Dict[str, Any]:
+    """Responses JSON 원문에서 output_text 조각만 추출합니다."""
+    return _slim_output(_collect_json(raw, (_OUTPUT_PARTS_PATH,))[_OUTPUT_PARTS_PATH])
 
-    # 1) Files API 업로드
-    with csv_path.open("rb") as f:
-        up = client.files.create(file=f, purpose="user_data")
 
+def _build_lda_request_body(file_id: str, extra_instruction: str = "", model: str = "gpt-5") -> Dict[str, Any]:
+    """
+    responses.create 인자와 batch JSONL의 body로 공통 사용하는 요청 본문.
+    CSV는 input_file로 주입하지 말고,
+    code_interpreter container의 file_ids로 첨부해야 합니다. :contentReference[oaicite:3]{index=3}
+    """
     prompt = BASE_LDA_PROMPT
     if extra_instruction.strip():
         prompt += "\n\n[추가 지시]\n" + extra_instruction.strip()
 
-    # 2) Responses + code_interpreter (auto container + file_ids)
-    resp = client.responses.create(
-        model=model,
-        tool_choice="required",
-        tools=[{
+    return {
+        "model": model,
+        "tool_choice": "required",
+        "tools": [{
             "type": "code_interpreter",
             "container": {
                 "type": "auto",
                 "memory_limit": "4g",
-                "file_ids": [up.id],
+                "file_ids": [file_id],
             },
         }],
-        instructions="너는 한국어로 답하는 데이터 분석가다. 반드시 python tool로 LDA를 수행하고 파일을 생성하라.",
-        input=[{
+        "instructions": "너는 한국어로 답하는 데이터 분석가다. 반드시 python tool로 LDA를 수행하고 파일을 생성하라.",
+        "input": [{
             "role": "user",
             "content": [{"type": "input_text", "text": prompt}],
         }],
-    )
+    }
 
-    resp_dict = resp.model_dump() if hasattr(resp, "model_dump") else json.loads(json.dumps(resp, default=str))
-    answer_text = (resp_dict.get("output_text") or "").strip()
 
-    # 3) 생성 파일 다운로드 후 job_dir에 저장
+@lru_cache(maxsize=1)
+def media_root() -> Path:
+    """MEDIA_ROOT의 realpath. 프로세스 동안 바뀌지 않으므로 한 번만 계산(설정 변경 시 캐시 비움)."""
+    return Path(settings.MEDIA_ROOT).resolve()
+
+
+@receiver(setting_changed)
+def _clear_media_root(setting, **kwargs):
+    # override_settings(MEDIA_ROOT=...) 등으로 바뀌면 캐시를 비움
+    if setting == "MEDIA_ROOT":
+        media_root.cache_clear()
+
+
+def _media_relpath(path: Path) -> str:
+    return path.relative_to(media_root()).as_posix()
+
+
+def _unique_out_paths(job_dir: Path, filenames: List[str]) -> List[Path]:
+    """같은 파일명이 여러 번 나오면 name_1.ext, name_2.ext ...로 바꿔 동시 다운로드가 한 파일에 겹쳐 쓰지 않게 합니다."""
+    used = set()
+    out_paths = []
+    for filename in filenames:
+        stem, suffix = os.path.splitext(filename)
+        candidate, n = filename, 0
+        while candidate.lower() in used:
+            n += 1
+            candidate = f"{stem}_{n}{suffix}"
+        used.add(candidate.lower())
+        out_paths.append(job_dir / candidate)
+    return out_paths
+
+
+def _save_container_files(api_key: str, resp_dict: Dict[str, Any], job_dir: Path) -> List[str]:
+    """생성 파일을 다운로드해 job_dir에 저장하고 MEDIA_ROOT 기준 상대경로를 돌려줍니다."""
     citations = _extract_container_file_citations(resp_dict)
 
-    media_root = Path(settings.MEDIA_ROOT).resolve()
-    saved_relpaths: List[str] = []
+    # job_dir만 한 번 resolve하고, 파일명은 _safe_filename으로 경로 성분이 제거되므로 그대로 붙임
+    job_dir = Path(job_dir).resolve()
+    out_paths = _unique_out_paths(job_dir, [_safe_filename(c["filename"]) for c in citations])
+
+    # 한 커넥션 풀(HTTP/2면 단일 커넥션 multiplexing)로 동시에 다운로드
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+        list(pool.map(
+            lambda c, out_path: _download_container_file(api_key, c["container_id"], c["file_id"], out_path),
+            citations, out_paths,
+        ))
 
-    for c in citations:
-        data = _download_container_file_bytes(api_key, c["container_id"], c["file_id"])
-        fname = _safe_filename(c["filename"])
-        out_path = (job_dir / fname).resolve()
-        out_path.write_bytes(data)
+    return [_media_relpath(out_path) for out_path in out_paths]
 
-        rel = out_path.relative_to(media_root)
-        saved_relpaths.append(str(rel).replace("\\", "/"))
+
+def _build_result(api_key: str, resp_dict: Dict[str, Any], job_dir: Path) -> LDAJobResult:
+    answer_text = (_extract_output_text(resp_dict) or "").strip()
+    saved_relpaths = _save_container_files(api_key, resp_dict, job_dir)
 
     if not answer_text:
         answer_text = "[완료] 실행은 끝났지만 요약 텍스트가 비어 있습니다."
 
     return LDAJobResult(answer_text=answer_text, saved_relpaths=saved_relpaths)
+
+
+def _file_content_hash(path: Path) -> str:
+    """
+    업로드 캐시 키. blake3(SIMD 병렬 트리 해시)가 있으면 mmap으로 바로 해시하고,
+    없으면 hashlib.file_digest(OpenSSL, SHA-NI 사용 가능)로 sha256을 계산합니다.
+    알고리즘이 섞여도 충돌하지 않도록 "<알고리즘>:" 접두어를 붙입니다.
+    """
+    with path.open("rb") as f:
+        if blake3 is not None:
+            if path.stat().st_size == 0:  # 빈 파일은 mmap 불가
+                return "blake3:" + blake3.blake3(b"").hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return "blake3:" + blake3.blake3(mm, max_threads=blake3.blake3.AUTO).hexdigest()
+        if hasattr(hashlib, "file_digest"):  # 3.11+
+            return "sha256:" + hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+        return "sha256:" + h.hexdigest()
+
+
+def _upload_csv(client: OpenAI, csv_path: Path) -> str:
+    """
+    CSV 내용 해시로 UploadedCSV를 조회해 이미 올린 파일이면 file id를 재사용하고,
+    없으면 Files API로 업로드 후 기록합니다.
+    """
+    digest = _file_content_hash(csv_path)
+    cached = UploadedCSV.objects.filter(content_hash=digest).first()
+    if cached is not None:
+        return cached.openai_file_id
+
+    with csv_path.open("rb") as f:
+        up = client.files.create(file=f, purpose="user_data")
+    UploadedCSV.objects.get_or_create(content_hash=digest, defaults={"openai_file_id": up.id})
+    return up.id
+
+
+def _api_key() -> str:
+    api_key = os.getenv("OPENAI_API_KEY") or getattr(settings, "OPENAI_API_KEY", None)
+    if not api_key:
+        raise ImproperlyConfigured(
+            "OPENAI_API_KEY가 설정되지 않았습니다. "
+            "catalog/services/api.env 또는 OS 환경변수 또는 settings.py를 확인하세요."
+        )
+    return api_key
+
+
+_NO_TOKEN_MESSAGE = "CSV에 사용할 수 있는 토큰이 없습니다(길이 2 이상 토큰 필요)."
+_CSV_READ_ERRORS = (UnicodeDecodeError, csv.Error) + ((pa.ArrowInvalid,) if pa is not None else ())
+
+
+def _has_usable_token(col) -> bool:
+    """공백 제거 후 길이 2 이상인 값이 하나라도 있는지 (Arrow 배열 그대로 계산)"""
+    lengths = pc.utf8_length(pc.utf8_trim_whitespace(pc.cast(col, pa.string())))
+    return bool(pc.any(pc.greater(lengths, 1)).as_py())
+
+
+def _csv_has_usable_token(csv_path: Path, encoding: str) -> bool:
+    """csv 모듈로 첫 사용 가능 토큰이 나올 때까지만 읽습니다."""
+    with csv_path.open(newline="", encoding=encoding) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if "tokens" in header:
+            idx = header.index("tokens")
+            cells = (t for row in reader if len(row) > idx for t in row[idx].split())
+        else:
+            cells = (cell for row in itertools.chain([header], reader) for cell in row)
+        return any(len(cell.strip()) > 1 for cell in cells)
+
+
+def _validate_csv(csv_path: Path) -> None:
+    """
+    과금되는 원격 code_interpreter 실행 전에 Arrow의 멀티스레드 C 파서로 CSV를 한 번 훑어
+    깨진 파일/토큰 없는 파일을 즉시 거릅니다. 토큰을 Python 문자열로 만들지 않습니다.
+    - 'tokens' 컬럼이 있으면 그 컬럼만, 없으면(헤더 없는 토큰 CSV) 모든 셀을 검사
+    - 헤더 없는 형식은 행마다 셀 개수가 달라 Arrow는 첫 행과 개수가 다른 행을 건너뛰므로,
+      거기서 토큰을 못 찾은 경우에만 csv 모듈로 다시 확인
+    pyarrow가 없으면 csv 모듈 확인만 합니다.
+    """
+    if csv_path.stat().st_size == 0:
+        raise ValueError("CSV가 비어 있습니다.")
+    try:
+        encoding = lda_local.csv_encoding(csv_path)
+        found = False
+        if pac is not None:
+            with csv_path.open(newline="", encoding=encoding) as f:
+                has_tokens_col = "tokens" in next(csv.reader(f), [])
+            stream = pac.open_csv(
+                csv_path,
+                read_options=pac.ReadOptions(
+                    use_threads=True, block_size=8 << 20, encoding=encoding,
+                    autogenerate_column_names=not has_tokens_col,
+                ),
+                parse_options=pac.ParseOptions(invalid_row_handler=lambda row: "skip"),
+                convert_options=pac.ConvertOptions(include_columns=["tokens"] if has_tokens_col else None),
+            )
+            for batch in stream:
+                if not found:
+                    found = any(_has_usable_token(col) for col in batch.columns)
+        if not found:
+            found = _csv_has_usable_token(csv_path, encoding)
+    except _CSV_READ_ERRORS as e:
+        raise ValueError(f"CSV를 읽을 수 없습니다(UTF-8 또는 CP949 CSV인지 확인하세요): {e}") from e
+
+    if not found:
+        raise ValueError(_NO_TOKEN_MESSAGE)
+
+
+def _read_local_docs(csv_path: Path) -> List[List[str]]:
+    """로컬 LDA 경로: 토큰 문서 리스트를 한 번만 읽고 그 결과로 검증까지 합니다."""
+    if csv_path.stat().st_size == 0:
+        raise ValueError("CSV가 비어 있습니다.")
+    try:
+        docs = lda_local.read_token_docs(csv_path)
+    except _CSV_READ_ERRORS as e:
+        raise ValueError(f"CSV를 읽을 수 없습니다(UTF-8 또는 CP949 CSV인지 확인하세요): {e}") from e
+    if not any(docs):
+        raise ValueError(_NO_TOKEN_MESSAGE)
+    return docs
+
+
+def _prepare_paths(csv_path: Path, job_dir: Path, validate: bool = True):
+    csv_path = Path(csv_path)
+    job_dir = Path(job_dir)
+    job_dir.mkdir(parents=True, exist_ok=True)
+
+    if not csv_path.exists():
+        raise FileNotFoundError(f"입력 CSV가 존재하지 않습니다: {csv_path}")
+    if validate:
+        _validate_csv(csv_path)
+    return csv_path, job_dir
+
+
+# 이 크기 미만 CSV는 원격 code_interpreter 대신 로컬 gensim으로 LDA 실행
+LOCAL_LDA_MAX_BYTES = 5 * 1024 * 1024
+def should_run_lda_locally(csv_path: Path) -> bool:
+    """작은 CSV이고 gensim/matplotlib가 설치되어 있으면 로컬 실행."""
+    return lda_local.is_available() and Path(csv_path).stat().st_size < LOCAL_LDA_MAX_BYTES
+
+
+def _summarize_topics(best_k: int, topic_terms: List[List[Tuple[str, float]]], extra_instruction: str = "") -> str:
+    """
+    토픽별 상위 단어만 gpt-4o-mini에 보내 한국어 요약을 받습니다(짧은 입력/출력 → 저비용).
+    API 호출이 안 되면 상위 단어 나열로 대신합니다.
+    """
+    lines = [f"토픽 {i}: " + ", ".join(term for term, _ in terms[:10]) for i, terms in enumerate(topic_terms)]
+    fallback = f"(a) 최적 K: {best_k}\n(b) 토픽별 상위 단어\n" + "\n".join(lines)
+
+    prompt = (
+        f"LDA 결과 최적 K={best_k}. 토픽별 상위 단어:\n" + "\n".join(lines)
+        + "\n\n한국어로 (a) 최적 K (b) 토픽 요약(각 1줄)만 간단히 출력하라."
+    )
+    if extra_instruction.strip():
+        prompt += "\n\n[추가 지시]\n" + extra_instruction.strip()
+    try:
+        resp = _client().chat.completions.create(
+            model="gpt-4o-mini",
+            max_tokens=512,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return (resp.choices[0].message.content or "").strip() or fallback
+    except Exception:
+        return fallback
+
+
+def _run_lda_local(docs: List[List[str]], job_dir: Path, ks=lda_local.LOCAL_LDA_KS, extra_instruction: str = "") -> LDAJobResult:
+    """
+    로컬 gensim으로 LDA를 수행하고(catalog.services.lda_local) 결과 파일을 job_dir에 저장합니다.
+    요약 텍스트만 gpt-4o-mini로 생성합니다.
+    """
+    fit = lda_local.fit_lda_sweep(docs, ks)
+    topic_terms, saved = lda_local.save_lda_artifacts(fit, job_dir.resolve())
+
+    return LDAJobResult(
+        answer_text=_summarize_topics(fit.best_k, topic_terms, extra_instruction),
+        saved_relpaths=[_media_relpath(p) for p in saved],
+    )
+
+
+def run_lda_from_csv(csv_path: Path, job_dir: Path, extra_instruction: str = "", model: str = "gpt-5") -> LDAJobResult:
+    """
+    동기 실행 경로:
+      run_lda_from_csv(upload_path, job_dir, extra_instruction=extra)
+    LOCAL_LDA_MAX_BYTES 미만이면 로컬 gensim, 그 외에는 원격 code_interpreter로 실행합니다.
+    (원격은 요청 스레드를 분 단위로 점유하므로 웹 요청에서는 submit_lda_batch 사용)
+    """
+    csv_path, job_dir = _prepare_paths(csv_path, job_dir, validate=False)
+    if should_run_lda_locally(csv_path):
+        docs = _read_local_docs(csv_path)
+        return _run_lda_local(docs, job_dir, extra_instruction=extra_instruction)
+    _validate_csv(csv_path)
+
+    client = _client()
+    api_key = _api_key()
+
+    # 1) Files API 업로드 (같은 내용이면 기존 file id 재사용)
+    file_id = _upload_csv(client, csv_path)
+
+    # 2) Responses + code_interpreter (auto container + file_ids)
+    raw = client.with_raw_response.responses.create(**_build_lda_request_body(file_id, extra_instruction, model))
+    resp_dict = _slim_response(raw.content)
+
+    # 3) 생성 파일 다운로드 후 job_dir에 저장
+    return _build_result(api_key, resp_dict, job_dir)
+
+
+def submit_lda_batch(csv_path: Path, job_dir: Path, extra_instruction: str = "", model: str = "gpt-5") -> str:
+    """
+    Batch API(/v1/responses, 24h window, 50% 비용)로 LDA 작업을 제출하고 batch id를 돌려줍니다.
+    결과 수집은 collect_lda_batch(manage.py poll_lda_batches)가 담당합니다.
+    """
+    client = _client()
+    csv_path, job_dir = _prepare_paths(csv_path, job_dir)
+
+    # 1) CSV 업로드 (code_interpreter container에 첨부될 파일, 같은 내용이면 재사용)
+    file_id = _upload_csv(client, csv_path)
+
+    # 2) 요청 1건짜리 batch 입력 JSONL 작성/업로드
+    line = {
+        "custom_id": job_dir.name,
+        "method": "POST",
+        "url": "/v1/responses",
+        "body": _build_lda_request_body(file_id, extra_instruction, model),
+    }
+    batch_input_path = job_dir / "batch_input.jsonl"
+    batch_input_path.write_text(json.dumps(line, ensure_ascii=False) + "\n", encoding="utf-8")
+    with batch_input_path.open("rb") as f:
+        batch_file = client.files.create(file=f, purpose="batch")
+
+    # 3) batch 생성
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/responses",
+        completion_window="24h",
+    )
+    return batch.id
+
+
+# 더 이상 결과가 나오지 않는 batch 상태
+BATCH_FAILED_STATUSES = {"failed", "expired", "cancelled", "cancelling"}
+
+
+class LDABatchFailed(Exception):
+    """batch가 실패/만료됐거나 결과가 비어 있어 다시 조회해도 결과를 받을 수 없는 경우."""
+
+
+def collect_lda_batch(batch_id: str, job_dir: Path) -> Optional[LDAJobResult]:
+    """
+    batch 상태를 조회해 완료됐으면 결과 파일을 job_dir에 저장하고 LDAJobResult를 돌려줍니다.
+    아직 진행 중이면 None, 실패/만료면 LDABatchFailed.
+    (API 키 누락은 ImproperlyConfigured, 네트워크/HTTP 오류는 그대로 전달되며 batch 실패로 보지 않음)
+    """
+    client = _client()
+    api_key = _api_key()
+    job_dir = Path(job_dir)
+    job_dir.mkdir(parents=True, exist_ok=True)
+
+    batch = client.batches.retrieve(batch_id)
+    if batch.status in BATCH_FAILED_STATUSES:
+        raise LDABatchFailed(f"batch {batch_id} 상태: {batch.status}")
+    if batch.status != "completed":
+        return None
+
+    if not batch.output_file_id:
+        detail = ""
+        if batch.error_file_id:
+            detail = client.files.content(batch.error_file_id).text.strip()
+        raise LDABatchFailed(f"batch {batch_id} 결과 파일이 없습니다. {detail}".strip())
+
+    for raw_line in client.files.content(batch.output_file_id).content.splitlines():
+        if not raw_line.strip():
+            continue
+        # 한 줄을 한 번만 훑어 오류/상태코드/본문 오류/출력 조각을 함께 꺼냄
+        parts_path = "response.body." + _OUTPUT_PARTS_PATH
+        found = _collect_json(raw_line, ("error", "response.status_code", "response.body.error", parts_path))
+        error = next(filter(None, found["error"]), None)
+        if error:
+            raise LDABatchFailed(f"batch {batch_id} 요청 실패: {error}")
+        status_code = next(iter(found["response.status_code"]), None)
+        if status_code != 200:
+            body_error = next(filter(None, found["response.body.error"]), None)
+            raise LDABatchFailed(f"batch {batch_id} 요청 실패(HTTP {status_code}): {body_error}")
+        return _build_result(api_key, _slim_output(found[parts_path]), job_dir)
+
+    raise LDABatchFailed(f"batch {batch_id} 결과가 비어 있습니다.")
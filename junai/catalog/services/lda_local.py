@@ -0,0 +1,226 @@
+# catalog/services/lda_local.py
+"""
+작은 CSV용 로컬 gensim LDA.
+joblib(loky) 워커가 _fit_one을 풀기 위해 이 모듈을 새 인터프리터에서 import하므로
+Django(settings/models)를 import하지 않습니다.
+numpy/gensim/matplotlib/pyarrow는 import만 1초 넘게 걸리므로(모든 manage.py 실행과 워커 부팅에 영향)
+실제로 LDA를 돌리는 함수 안에서 import합니다.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import importlib.util
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+LOCAL_LDA_KS = (8, 10, 12, 15)
+TOPIC_TOP_N = 20
+
+_KOREAN_FONTS = ("Malgun Gothic", "AppleGothic", "NanumGothic", "NanumBarunGothic", "Noto Sans CJK KR", "Noto Sans KR")
+
+
+@lru_cache(maxsize=1)
+def is_available() -> bool:
+    """선택 의존성(pip install gensim matplotlib joblib, numpy 포함)이 설치되어 있는지 import 없이 확인."""
+    return all(importlib.util.find_spec(name) is not None for name in ("numpy", "joblib", "matplotlib", "gensim"))
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def csv_encoding(csv_path: Path) -> str:
+    """앞부분 1MB가 UTF-8로 읽히면 utf-8-sig, 아니면 (엑셀 한글 CSV 기본값인) cp949."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with csv_path.open("rb") as f:
+        try:
+            decoder.decode(f.read(1024 * 1024), final=False)
+        except UnicodeDecodeError:
+            return "cp949"
+    return "utf-8-sig"
+
+
+def _normalize(tokens) -> List[str]:
+    tokens = (t.strip().lower() for t in tokens)
+    return [t for t in tokens if len(t) > 1]
+
+
+def read_token_docs(csv_path: Path) -> List[List[str]]:
+    """
+    BASE_LDA_PROMPT의 입력 형식대로 CSV를 문서(행)별 토큰 리스트로 읽습니다.
+    - 'tokens' 컬럼이 있으면: 공백으로 구분된 토큰 문자열 (pyarrow가 있으면 분리/정규화를 pyarrow.compute로)
+    - 그 외: 헤더 없는 CSV, 각 셀이 토큰 (행마다 셀 개수가 달라 csv 모듈로 읽음)
+    - 빈 토큰/길이 1 토큰 제거, 소문자화
+    - 인코딩은 UTF-8, 아니면 cp949로 읽음
+    """
+    encoding = csv_encoding(csv_path)
+    with csv_path.open(newline="", encoding=encoding) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if "tokens" not in header:
+            return [_normalize(row) for row in [header, *reader]] if header else []
+
+    try:  # 선택 의존성: pip install pyarrow ('tokens' 컬럼 분리/정규화 가속)
+        import numpy as np
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pac
+    except ImportError:
+        with csv_path.open(newline="", encoding=encoding) as f:
+            return [_normalize((row.get("tokens") or "").split()) for row in csv.DictReader(f)]
+
+    tbl = pac.read_csv(
+        csv_path,
+        read_options=pac.ReadOptions(use_threads=True, block_size=8 << 20, encoding=encoding),
+        convert_options=pac.ConvertOptions(include_columns=["tokens"], column_types={"tokens": pa.string()}),
+    )
+    lists = pc.utf8_split_whitespace(pc.utf8_lower(tbl["tokens"].combine_chunks()))
+    values = pc.list_flatten(lists)
+    keep = pc.greater(pc.utf8_length(values), 1)
+    kept = pc.filter(values, keep).to_pylist()
+    parents = pc.filter(pc.list_parent_indices(lists), keep).to_numpy(zero_copy_only=False)
+    bounds = np.searchsorted(parents, np.arange(tbl.num_rows + 1))
+    return [kept[bounds[i]:bounds[i + 1]] for i in range(tbl.num_rows)]
+
+
+@dataclass
+class LocalLDAFit:
+    best_k: int
+    lda: Any
+    coherences: Dict[int, float]
+    corpus: List[List[Tuple[int, int]]]
+
+
+def _fit_one(corpus, id2word, texts, k: int):
+    """
+    K 하나에 대한 LDA 학습 + c_v coherence. joblib 워커에서 실행되므로
+    중첩 프로세스 풀이 생기지 않게 LdaMulticore 대신 LdaModel, coherence도 단일 프로세스로 계산.
+    """
+    from gensim.models import CoherenceModel, LdaModel
+
+    lda = LdaModel(corpus, id2word=id2word, num_topics=k, chunksize=2000, passes=10, random_state=42)
+    coherence = CoherenceModel(model=lda, texts=texts, dictionary=id2word, coherence="c_v", processes=1).get_coherence()
+    return k, lda, coherence
+
+
+def fit_lda_sweep(docs: List[List[str]], ks: Sequence[int] = LOCAL_LDA_KS, n_jobs: Optional[int] = None) -> LocalLDAFit:
+    """
+    BASE_LDA_PROMPT와 같은 절차(바이그램 → K 후보별 학습 → c_v로 최적 K)를 로컬 gensim으로 수행합니다.
+    K 후보별 학습은 서로 독립이므로 loky 프로세스 병렬로 동시에 수행합니다.
+    """
+    from gensim.corpora import Dictionary
+    from gensim.models import Phrases
+    from joblib import Parallel, delayed
+
+    bigram = Phrases(docs, min_count=5, threshold=10).freeze()
+    texts = [bigram[doc] for doc in docs]
+
+    id2word = Dictionary(texts)
+    id2word.filter_extremes(no_below=2, no_above=0.5)
+    if len(id2word) == 0:  # 아주 작은 말뭉치는 필터링 없이 사용
+        id2word = Dictionary(texts)
+    corpus = [id2word.doc2bow(text) for text in texts]
+
+    if n_jobs is None:
+        n_jobs = max(1, min(len(ks), os.cpu_count() or 1))
+    fitted = Parallel(n_jobs=n_jobs, backend="loky")(
+        delayed(_fit_one)(corpus, id2word, texts, k) for k in ks
+    )
+    models: Dict[int, Any] = {k: lda for k, lda, _ in fitted}
+    coherences: Dict[int, float] = {k: coherence for k, _, coherence in fitted}
+
+    best_k = max(coherences, key=coherences.get)
+    return LocalLDAFit(best_k=best_k, lda=models[best_k], coherences=coherences, corpus=corpus)
+
+
+def _setup_korean_font() -> None:
+    from matplotlib import font_manager
+
+    plt = _pyplot()
+    available = {f.name for f in font_manager.fontManager.ttflist}
+    for name in _KOREAN_FONTS:
+        if name in available:
+            plt.rcParams["font.family"] = name
+            break
+    plt.rcParams["axes.unicode_minus"] = False
+
+
+def _save_figure(fig, out_path: Path) -> None:
+    fig.tight_layout()
+    fig.savefig(out_path, bbox_inches="tight", pad_inches=0.2, dpi=200)
+    _pyplot().close(fig)
+
+
+def save_lda_artifacts(fit: LocalLDAFit, job_dir: Path) -> Tuple[List[List[Tuple[str, float]]], List[Path]]:
+    """
+    원격 실행과 같은 이름의 결과 파일(coherence_by_k.png, topics.csv, doc_topic.csv 등)을 job_dir에 저장하고
+    (토픽별 상위 단어, 저장한 파일 경로 리스트)를 돌려줍니다.
+    """
+    import numpy as np
+
+    plt = _pyplot()
+    best_k, lda, coherences, corpus = fit.best_k, fit.lda, fit.coherences, fit.corpus
+    saved: List[Path] = []
+    _setup_korean_font()
+
+    # coherence_by_k.png
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.plot(list(coherences), list(coherences.values()), marker="o")
+    ax.set_xlabel("K (토픽 수)")
+    ax.set_ylabel("Coherence (c_v)")
+    ax.set_title(f"K별 Coherence (최적 K={best_k})")
+    _save_figure(fig, job_dir / "coherence_by_k.png")
+    saved.append(job_dir / "coherence_by_k.png")
+
+    # topics.csv + topic_terms_topic{i}.png
+    topic_terms = [lda.show_topic(i, topn=TOPIC_TOP_N) for i in range(best_k)]
+    with (job_dir / "topics.csv").open("w", newline="", encoding="utf-8-sig") as f:
+        w = csv.writer(f)
+        w.writerow(["topic_id", "term", "weight"])
+        for i, terms in enumerate(topic_terms):
+            for term, weight in terms:
+                w.writerow([i, term, f"{np.float16(weight):.4f}"])
+    saved.append(job_dir / "topics.csv")
+
+    for i, terms in enumerate(topic_terms):
+        top = terms[:10][::-1]
+        fig, ax = plt.subplots(figsize=(6, 4))
+        ax.barh([t for t, _ in top], [wt for _, wt in top])
+        ax.set_title(f"토픽 {i} 상위 단어")
+        _save_figure(fig, job_dir / f"topic_terms_topic{i}.png")
+        saved.append(job_dir / f"topic_terms_topic{i}.png")
+
+    # doc_topic.csv
+    # 순위/시각화에는 float16이면 충분하므로 저장 크기를 줄임
+    doc_topic = np.zeros((len(corpus), best_k), dtype=np.float32)
+    for d, bow in enumerate(corpus):
+        for topic_id, prob in lda.get_document_topics(bow, minimum_probability=0.0):
+            doc_topic[d, topic_id] = prob
+    doc_topic = doc_topic.astype(np.float16)
+    with (job_dir / "doc_topic.csv").open("w", newline="", encoding="utf-8-sig") as f:
+        f.write(",".join(["doc_id"] + [f"topic_{i}" for i in range(best_k)]) + "\n")
+        np.savetxt(
+            f, np.column_stack([np.arange(len(doc_topic)), doc_topic]),
+            delimiter=",", fmt=["%d"] + ["%.4f"] * best_k,
+        )
+    np.save(job_dir / "doc_topic.npy", doc_topic)
+    saved += [job_dir / "doc_topic.csv", job_dir / "doc_topic.npy"]
+
+    # topic_prevalence.png
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.bar([str(i) for i in range(best_k)], doc_topic.mean(axis=0, dtype=np.float32))
+    ax.set_xlabel("토픽")
+    ax.set_ylabel("평균 문서 비중")
+    ax.set_title("토픽 비중")
+    _save_figure(fig, job_dir / "topic_prevalence.png")
+    saved.append(job_dir / "topic_prevalence.png")
+
+    return topic_terms, saved
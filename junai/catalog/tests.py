@@ -1,3 +1,412 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import httpx
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import LDAJob, ToolList, UploadedCSV
+from catalog.services import lda, lda_local
+from catalog.services.lda import LDAJobResult
+
+
+def _sample_docs():
+	"""두 주제(과일/교통)가 섞인 작은 말뭉치"""
+	fruit = ['사과', '바나나', '포도', '딸기', '수박', '과일']
+	traffic = ['버스', '지하철', '택시', '기차', '자전거', '교통']
+	docs = []
+	for i in range(30):
+		words = fruit if i % 2 else traffic
+		docs.append([words[(i + j) % len(words)] for j in range(8)])
+	return docs
+
+
+@skipUnless(lda_local.is_available(), 'gensim/matplotlib/joblib가 설치되어 있어야 합니다.')
+class LocalLDASweepTests(SimpleTestCase):
+
+	def test_sweep_runs_in_worker_processes(self):
+		# loky 워커가 lda_local을 Django 설정 없이 import할 수 있어야 함
+		fit = lda_local.fit_lda_sweep(_sample_docs(), ks=(2, 3), n_jobs=2)
+		self.assertIn(fit.best_k, (2, 3))
+		self.assertEqual(set(fit.coherences), {2, 3})
+		self.assertEqual(len(fit.corpus), 30)
+
+
+class LocalLDAImportTests(SimpleTestCase):
+
+	def test_heavy_dependencies_are_imported_lazily(self):
+		# manage.py 실행/워커 부팅마다 gensim 등을 import하지 않아야 함
+		code = (
+			'import sys, django; django.setup(); import catalog.views; '
+			'print(sorted(m for m in ("gensim", "matplotlib", "joblib") if m in sys.modules))'
+		)
+		out = subprocess.run(
+			[sys.executable, '-c', code], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+			env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'junai.settings'},
+		).stdout
+		self.assertEqual(out.strip(), '[]')
+
+
+class CSVTokenTests(SimpleTestCase):
+
+	def setUp(self):
+		tmp = tempfile.TemporaryDirectory()
+		self.addCleanup(tmp.cleanup)
+		self.tmp = Path(tmp.name)
+
+	def write(self, name, text, encoding='utf-8'):
+		path = self.tmp / name
+		path.write_text(text, encoding=encoding)
+		return path
+
+	def test_read_tokens_column(self):
+		path = self.write('t.csv', 'id,tokens\n1,"Hello  World a"\n2,\n3,b cc DD\n')
+		self.assertEqual(lda_local.read_token_docs(path), [['hello', 'world'], [], ['cc', 'dd']])
+
+	def test_read_headerless_ragged_cp949(self):
+		path = self.write('h.csv', '카톡, 화면 ,a\n업데이트\n', encoding='cp949')
+		self.assertEqual(lda_local.read_token_docs(path), [['카톡', '화면'], ['업데이트']])
+
+	def test_validate_accepts_ragged_headerless(self):
+		path = self.write('h.csv', 'x,y\n카톡,화면,업데이트\n')
+		lda._validate_csv(path)
+
+	def test_validate_rejects_csv_without_usable_tokens(self):
+		path = self.write('n.csv', 'a,b\nc,d,e\n')
+		with self.assertRaises(ValueError):
+			lda._validate_csv(path)
+
+	def test_validate_rejects_empty_tokens_column(self):
+		path = self.write('e.csv', 'id,tokens\n1,\n2,a\n')
+		with self.assertRaises(ValueError):
+			lda._validate_csv(path)
+
+	def test_local_path_reads_csv_once(self):
+		path = self.write('t.csv', 'id,tokens\n1,사과 바나나\n')
+		job_dir = self.tmp / 'job'
+		with mock.patch.object(lda, 'should_run_lda_locally', return_value=True), \
+				mock.patch.object(lda, '_validate_csv') as validate, \
+				mock.patch.object(lda_local, 'read_token_docs', wraps=lda_local.read_token_docs) as read, \
+				mock.patch.object(lda, '_run_lda_local') as run_local:
+			lda.run_lda_from_csv(path, job_dir)
+		validate.assert_not_called()
+		read.assert_called_once()
+		self.assertEqual(run_local.call_args.args[0], [['사과', '바나나']])
+
+
+class LDAJobFlowTests(TestCase):
+
+	def setUp(self):
+		tmp = tempfile.TemporaryDirectory()
+		self.addCleanup(tmp.cleanup)
+		override = override_settings(MEDIA_ROOT=tmp.name)
+		override.enable()
+		self.addCleanup(override.disable)
+		self.tool = ToolList.objects.create(name='OpenAI - LDA')
+		self.media_root = Path(tmp.name)
+
+	def upload(self, **data):
+		csv_file = SimpleUploadedFile('tokens.csv', 'id,tokens\n1,사과 바나나\n'.encode('utf-8'))
+		return self.client.post(self.tool.get_absolute_url(), {'csv_file': csv_file, **data})
+
+	def test_large_csv_is_submitted_as_batch(self):
+		with mock.patch('catalog.views.should_run_lda_locally', return_value=False), \
+				mock.patch('catalog.views.submit_lda_batch', return_value='batch_123') as submit:
+			response = self.upload()
+		job = LDAJob.objects.get()
+		self.assertRedirects(response, job.get_absolute_url())
+		submit.assert_called_once()
+		self.assertEqual(job.batch_id, 'batch_123')
+		self.assertTrue(job.is_pending)
+
+	def test_small_csv_runs_outside_the_request(self):
+		res = LDAJobResult(answer_text='최적 K: 8', saved_relpaths=['lda_results/x/topics.csv'])
+		with mock.patch('catalog.views.should_run_lda_locally', return_value=True), \
+				mock.patch('catalog.views.submit_lda_batch') as submit:
+			response = self.upload(extra_instruction='토픽 이름도 붙여 주세요')
+		job = LDAJob.objects.get()
+		self.assertRedirects(response, job.get_absolute_url())
+		submit.assert_not_called()
+		self.assertEqual((job.status, job.batch_id), (LDAJob.STATUS_PENDING, ''))
+		self.assertContains(self.client.get(job.get_absolute_url()), '서버에서 LDA를 실행합니다')
+
+		run = 'catalog.management.commands.poll_lda_batches.run_lda_from_csv'
+		with mock.patch(run, return_value=res) as run_lda:
+			call_command('poll_lda_batches', stdout=io.StringIO(), stderr=io.StringIO())
+		csv_path, job_dir = run_lda.call_args.args
+		self.assertEqual(csv_path.read_bytes(), 'id,tokens\n1,사과 바나나\n'.encode('utf-8'))
+		self.assertEqual(run_lda.call_args.kwargs, {'extra_instruction': '토픽 이름도 붙여 주세요'})
+		job.refresh_from_db()
+		self.assertEqual(job.status, LDAJob.STATUS_COMPLETED)
+		self.assertEqual(job.saved_relpaths, ['lda_results/x/topics.csv'])
+
+	def test_submit_error_marks_job_failed(self):
+		with mock.patch('catalog.views.should_run_lda_locally', return_value=False), \
+				mock.patch('catalog.views.submit_lda_batch', side_effect=ValueError('CSV에 사용할 수 있는 토큰이 없습니다')):
+			self.upload()
+		job = LDAJob.objects.get()
+		self.assertEqual(job.status, LDAJob.STATUS_FAILED)
+		self.assertIn('토큰', job.answer_text)
+
+	def test_artifact_is_served_only_from_lda_results(self):
+		job_dir = self.media_root / 'lda_results' / 'job'
+		job_dir.mkdir(parents=True)
+		(job_dir / 'topics.csv').write_text('topic,term\n')
+		(self.media_root / 'secret.txt').write_text('secret')
+		response = self.client.get(reverse('lda-artifact', args=['lda_results/job/topics.csv']))
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(b''.join(response.streaming_content), b'topic,term\n')
+		for relpath in ('lda_results/../secret.txt', 'secret.txt', 'lda_results/job/missing.csv'):
+			with self.subTest(relpath=relpath):
+				self.assertEqual(self.client.get(reverse('lda-artifact', args=[relpath])).status_code, 404)
+
+	@override_settings(LDA_ARTIFACT_ACCEL_PREFIX='/protected/')
+	def test_artifact_uses_accel_redirect(self):
+		job_dir = self.media_root / 'lda_results' / 'job'
+		job_dir.mkdir(parents=True)
+		(job_dir / 'topics.csv').write_text('')
+		response = self.client.get(reverse('lda-artifact', args=['lda_results/job/topics.csv']))
+		self.assertEqual(response['X-Accel-Redirect'], '/protected/lda_results/job/topics.csv')
+
+
+def _message_with_files(*files):
+	"""container_file_citation 주석이 달린 Responses API 출력 dict."""
+	annotations = [
+		{'type': 'container_file_citation', 'container_id': 'cntr_1', 'file_id': file_id, 'filename': filename}
+		for file_id, filename in files
+	]
+	return {'output': [{'type': 'message', 'content': [
+		{'type': 'output_text', 'text': '요약', 'annotations': annotations},
+	]}]}
+
+
+class ContainerFilesTests(SimpleTestCase):
+
+	def test_duplicate_filenames_get_distinct_paths(self):
+		resp = _message_with_files(('f1', 'topics.png'), ('f2', 'topics.png'), ('f3', 'TOPICS.png'), ('f4', 'dir/topics_1.png'))
+		with tempfile.TemporaryDirectory() as tmp, \
+				mock.patch.object(lda, 'media_root', return_value=Path(tmp).resolve()), \
+				mock.patch.object(lda, '_download_container_file') as download:
+			relpaths = lda._save_container_files('key', resp, Path(tmp) / 'lda_results' / 'job')
+		out_paths = [c.args[3] for c in download.call_args_list]
+		self.assertEqual(len({p.name.lower() for p in out_paths}), 4)
+		self.assertEqual(
+			relpaths,
+			['lda_results/job/topics.png', 'lda_results/job/topics_1.png',
+				'lda_results/job/TOPICS_2.png', 'lda_results/job/topics_1_1.png'],
+		)
+
+
+class ResponseParsingTests(SimpleTestCase):
+
+	def response_json(self):
+		resp = _message_with_files(('f1', 'topics.csv'), ('f1', 'topics.csv'), ('f2', 'doc_topic.npy'))
+		resp['output'].insert(0, {'type': 'code_interpreter_call', 'code': 'print(1)', 'outputs': [{'type': 'logs', 'logs': 'x' * 1000}]})
+		resp['output'][1]['content'].append({'type': 'refusal', 'refusal': '...'})
+		return json.dumps(resp, ensure_ascii=False).encode('utf-8')
+
+	def test_slim_response_keeps_only_output_text(self):
+		for ijson_module in (lda.ijson, None):
+			with self.subTest(ijson=ijson_module is not None), mock.patch.object(lda, 'ijson', ijson_module):
+				slim = lda._slim_response(self.response_json())
+				self.assertEqual(lda._extract_output_text(slim), '요약')
+				self.assertEqual([p['type'] for p in slim['output'][0]['content']], ['output_text'])
+
+	def test_citations_are_deduplicated(self):
+		citations = lda._extract_container_file_citations(lda._slim_response(self.response_json()))
+		self.assertEqual([c['file_id'] for c in citations], ['f1', 'f2'])
+		self.assertEqual(citations[0], {'container_id': 'cntr_1', 'file_id': 'f1', 'filename': 'topics.csv'})
+
+	def collect(self, line):
+		client = mock.Mock()
+		client.batches.retrieve.return_value = mock.Mock(status='completed', output_file_id='file_out')
+		client.files.content.return_value.content = json.dumps(line).encode('utf-8') + b'\n'
+		with tempfile.TemporaryDirectory() as tmp, \
+				mock.patch.object(lda, '_client', return_value=client), \
+				mock.patch.object(lda, '_api_key', return_value='key'), \
+				mock.patch.object(lda, '_build_result', return_value='result') as build:
+			return lda.collect_lda_batch('batch_1', Path(tmp)), build
+
+	def test_collect_batch_success(self):
+		body = json.loads(self.response_json())
+		result, build = self.collect({'custom_id': 'job', 'response': {'status_code': 200, 'body': body}, 'error': None})
+		self.assertEqual(result, 'result')
+		slim = build.call_args.args[1]
+		self.assertEqual(len(lda._extract_container_file_citations(slim)), 2)
+
+	def test_collect_batch_http_error(self):
+		line = {'response': {'status_code': 400, 'body': {'error': {'message': 'bad model'}}}, 'error': None}
+		with self.assertRaisesRegex(lda.LDABatchFailed, 'HTTP 400.*bad model'):
+			self.collect(line)
+
+
+class UploadCacheTests(TestCase):
+
+	def write(self, data):
+		tmp = tempfile.TemporaryDirectory()
+		self.addCleanup(tmp.cleanup)
+		path = Path(tmp.name) / 'tokens.csv'
+		path.write_bytes(data)
+		return path
+
+	def test_sha256_fallback_without_blake3(self):
+		data = 'id,tokens\n1,사과 바나나\n'.encode('utf-8')
+		with mock.patch.object(lda, 'blake3', None):
+			self.assertEqual(lda._file_content_hash(self.write(data)), 'sha256:' + hashlib.sha256(data).hexdigest())
+			self.assertEqual(lda._file_content_hash(self.write(b'')), 'sha256:' + hashlib.sha256(b'').hexdigest())
+
+	@skipUnless(lda.blake3 is not None, 'blake3가 설치되어 있어야 합니다.')
+	def test_blake3_hash(self):
+		data = b'id,tokens\n' * 1000
+		self.assertEqual(lda._file_content_hash(self.write(data)), 'blake3:' + lda.blake3.blake3(data).hexdigest())
+		self.assertEqual(lda._file_content_hash(self.write(b'')), 'blake3:' + lda.blake3.blake3(b'').hexdigest())
+
+	def test_same_content_is_uploaded_once(self):
+		client = mock.Mock()
+		client.files.create.return_value = mock.Mock(id='file_1')
+		data = b'id,tokens\n1,apple banana\n'
+		self.assertEqual(lda._upload_csv(client, self.write(data)), 'file_1')
+		self.assertEqual(lda._upload_csv(client, self.write(data)), 'file_1')
+		client.files.create.assert_called_once()
+		self.assertTrue(UploadedCSV.objects.get().content_hash.startswith(('blake3:', 'sha256:')))
+
+
+class AskStreamTests(TestCase):
+
+	def setUp(self):
+		self.tool = ToolList.objects.create(name='OpenAI - LDA')
+
+	def ask(self, q='LDA가 뭐야?', pk=None):
+		return self.client.get(reverse('tool-ask', args=[pk or self.tool.pk]), {'q': q})
+
+	def frames(self, response):
+		body = b''.join(response.streaming_content).decode('utf-8')
+		self.assertTrue(body.endswith('\n\n'))
+		return [json.loads(frame.removeprefix('data: ')) for frame in body.split('\n\n') if frame]
+
+	def test_streams_deltas_then_done(self):
+		with mock.patch('catalog.views.stream_answer', return_value=iter(['토픽', ' 모델'])) as stream:
+			response = self.ask()
+			frames = self.frames(response)
+		stream.assert_called_once_with('LDA가 뭐야?')
+		self.assertEqual(response['Content-Type'], 'text/event-stream')
+		self.assertEqual(response['X-Accel-Buffering'], 'no')
+		self.assertEqual(response['Cache-Control'], 'no-cache')
+		self.assertEqual(frames, [{'delta': '토픽'}, {'delta': ' 모델'}, {'done': True}])
+
+	def test_generator_error_is_sent_as_frame(self):
+		def failing(question):
+			yield '부분'
+			raise RuntimeError('rate limited')
+
+		with mock.patch('catalog.views.stream_answer', side_effect=failing):
+			frames = self.frames(self.ask())
+		self.assertEqual(frames, [{'delta': '부분'}, {'error': 'rate limited'}, {'done': True}])
+
+	def test_empty_question_is_rejected(self):
+		with mock.patch('catalog.views.stream_answer') as stream:
+			self.assertEqual(self.ask(q='  ').status_code, 400)
+		stream.assert_not_called()
+
+	def test_unknown_tool_is_404(self):
+		self.assertEqual(self.ask(pk=self.tool.pk + 1).status_code, 404)
+
+
+class PollLDABatchesTests(TestCase):
+
+	def setUp(self):
+		tool = ToolList.objects.create(name='OpenAI - LDA')
+		self.job = LDAJob.objects.create(tool=tool, batch_id='batch_1', job_rel_dir='lda_results/tool_1/x')
+
+	def poll(self, **collect):
+		with mock.patch('catalog.management.commands.poll_lda_batches.collect_lda_batch', **collect):
+			call_command('poll_lda_batches', stdout=io.StringIO(), stderr=io.StringIO())
+		self.job.refresh_from_db()
+
+	def http_error(self, status):
+		request = httpx.Request('GET', 'https://api.openai.com/v1/containers/c/files/f/content')
+		response = httpx.Response(status, request=request)
+		return httpx.HTTPStatusError(str(status), request=request, response=response)
+
+	def test_client_error_is_terminal(self):
+		self.poll(side_effect=self.http_error(404))
+		self.assertEqual(self.job.status, LDAJob.STATUS_FAILED)
+
+	def test_transient_error_is_retried(self):
+		self.poll(side_effect=httpx.ConnectError('boom'))
+		self.assertEqual(self.job.status, LDAJob.STATUS_PENDING)
+		self.poll(side_effect=self.http_error(503))
+		self.assertEqual(self.job.status, LDAJob.STATUS_PENDING)
+
+	def test_local_job_error_marks_job_failed(self):
+		job = LDAJob.objects.create(tool=self.job.tool, job_rel_dir='lda_results/tool_1/y', uploaded_filename='t.csv')
+		with mock.patch('catalog.management.commands.poll_lda_batches.run_lda_from_csv', side_effect=ValueError('CSV가 비어 있습니다.')):
+			self.poll(return_value=None)
+		job.refresh_from_db()
+		self.assertEqual(job.status, LDAJob.STATUS_FAILED)
+		self.assertIn('비어', job.answer_text)
+
+	def test_interrupted_local_job_is_failed(self):
+		# 실행 중 프로세스가 죽어 running에 남은 작업
+		job = LDAJob.objects.create(tool=self.job.tool, job_rel_dir='lda_results/tool_1/y', status=LDAJob.STATUS_RUNNING)
+		LDAJob.objects.filter(pk=job.pk).update(updated=timezone.now() - timedelta(hours=2))
+		with mock.patch('catalog.management.commands.poll_lda_batches.run_lda_from_csv') as run_lda:
+			self.poll(return_value=None)
+		run_lda.assert_not_called()
+		job.refresh_from_db()
+		self.assertEqual(job.status, LDAJob.STATUS_FAILED)
+
+	def test_failed_batch_is_terminal(self):
+		self.poll(side_effect=lda.LDABatchFailed('batch batch_1 상태: expired'))
+		self.assertEqual(self.job.status, LDAJob.STATUS_FAILED)
+		self.assertIn('expired', self.job.answer_text)
+
+	def test_config_and_auth_errors_do_not_fail_jobs(self):
+		# 오래된 작업이라도 키 누락/만료 때문에 실패로 확정하지 않음
+		LDAJob.objects.filter(pk=self.job.pk).update(created=timezone.now() - timedelta(hours=49))
+		for error in (ImproperlyConfigured('OPENAI_API_KEY가 설정되지 않았습니다.'), self.http_error(401), self.http_error(403)):
+			with self.subTest(error=error), self.assertRaises(CommandError):
+				self.poll(side_effect=error)
+			self.job.refresh_from_db()
+			self.assertEqual(self.job.status, LDAJob.STATUS_PENDING)
+
+	def test_stale_job_is_failed(self):
+		LDAJob.objects.filter(pk=self.job.pk).update(created=timezone.now() - timedelta(hours=49))
+		self.poll(return_value=None)
+		self.assertEqual(self.job.status, LDAJob.STATUS_FAILED)
+
+	def test_completed_batch_stores_result(self):
+		self.poll(return_value=LDAJobResult(answer_text='완료', saved_relpaths=['a.png']))
+		self.assertEqual(self.job.status, LDAJob.STATUS_COMPLETED)
+		self.assertEqual(self.job.saved_relpaths, ['a.png'])
+
+
+class OpenAIClientTests(SimpleTestCase):
+
+	def test_http_pool_is_not_shared_across_processes(self):
+		# fork된 워커는 부모가 연 커넥션 풀을 재사용하지 않아야 함
+		with mock.patch('catalog.services.lda.os.getpid', return_value=1001):
+			parent = lda._http()
+			self.assertIs(lda._http(), parent)
+		with mock.patch('catalog.services.lda.os.getpid', return_value=1002):
+			self.assertIsNot(lda._http(), parent)
+
+	def test_warmup_runs_once_per_process(self):
+		with mock.patch('catalog.services.lda.os.getpid', return_value=2001), \
+				mock.patch('catalog.services.lda.threading.Thread') as thread:
+			lda.warmup_openai(sender=None)
+			lda.warmup_openai(sender=None)
+		thread.assert_called_once()
@@ -6,4 +6,7 @@ urlpatterns = [
 	path('', views.index, name='index'),
 	path('tools/', views.ToolListView.as_view(), name='tools'),
 	path('tool/<int:pk>/', views.ToolDetailView.as_view(), name='tool-detail'),
+	path('tool/<int:pk>/ask/', views.ask_stream, name='tool-ask'),
+	path('tool/<int:pk>/job/<int:job_pk>/', views.LDAJobDetailView.as_view(), name='lda-job-detail'),
+	path('artifacts/<path:relpath>', views.lda_artifact, name='lda-artifact'),
 ]
\ No newline at end of file
@@ -1,23 +1,26 @@
 from __future__ import annotations
 
+import json
+import shutil
 from pathlib import Path
 from datetime import datetime
+from urllib.parse import quote
 from uuid import uuid4
 
 from django.conf import settings
-from django.shortcuts import render
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.views import generic
 from django.views.generic.edit import FormMixin
-from django.utils.text import get_valid_filename
 
-from catalog.models import ToolList
+from catalog.models import LDAJob, ToolList
 from .forms import LDAUploadForm
-from catalog.services.lda import run_lda_from_csv
+from catalog.services.lda import media_root, should_run_lda_locally, stream_answer, submit_lda_batch
 
 
 def index(request):
     """Home page"""
-    tool_list = ToolList.objects.all()
+    tool_list = ToolList.objects.select_related("analysismodels").only("id", "name", "analysismodels__name")
     context = {
         "num_tools": tool_list.count(),
         "tool_list": tool_list,
@@ -27,6 +30,7 @@ def index(request):
 
 class ToolListView(generic.ListView):
     model = ToolList
+    queryset = ToolList.objects.select_related("analysismodels").only("id", "name", "analysismodels__name")
     context_object_name = "tool_list"
     template_name = "catalog/tool_list.html"
 
@@ -35,6 +39,8 @@ class ToolDetailView(FormMixin, generic.DetailView):
     """
     (변경됨)
     - 질문 텍스트 입력이 아니라 CSV 업로드 후 LDA 실행
+    - 작은 CSV는 로컬 gensim으로 바로 실행, 그 외는 OpenAI Batch API로 제출
+    - 이후 작업 페이지(LDAJobDetailView)로 이동
     - 결과: answer 텍스트 + 생성된 파일 목록(그래프 png, 결과 csv 등)
     """
     model = ToolList
@@ -47,7 +53,7 @@ class ToolDetailView(FormMixin, generic.DetailView):
         pk = self.kwargs.get("pk") or self.kwargs.get("primary_key")
         if pk is None:
             return super().get_object(queryset=queryset)
-        return ToolList.objects.get(pk=pk)
+        return get_object_or_404(ToolList.objects.select_related("analysismodels"), pk=pk)
 
     def get_success_url(self):
         return self.request.path
@@ -56,8 +62,6 @@ class ToolDetailView(FormMixin, generic.DetailView):
         ctx = super().get_context_data(**kwargs)
         if "form" not in ctx:
             ctx["form"] = self.get_form()
-        # 템플릿에서 미디어 링크 생성용
-        ctx["MEDIA_URL"] = settings.MEDIA_URL
 
         # 결과 렌더링용 기본값
         ctx.setdefault("answer", None)
@@ -109,25 +113,30 @@ class ToolDetailView(FormMixin, generic.DetailView):
             job_dir = Path(settings.MEDIA_ROOT) / job_rel_dir
             job_dir.mkdir(parents=True, exist_ok=True)
 
+            job = LDAJob(
+                tool=self.object,
+                job_rel_dir=job_rel_dir,
+                uploaded_filename=uploaded_filename,
+                extra_instruction=extra,
+            )
+
             # --- 업로드 파일 저장 ---
-            safe_name = get_valid_filename(f.name)
-            upload_path = job_dir / f"input_{safe_name}"
+            upload_path = Path(settings.MEDIA_ROOT) / job.input_relpath
+            f.seek(0)
             with upload_path.open("wb") as out:
-                for chunk in f.chunks():
-                    out.write(chunk)
-
-            # --- OpenAI LDA 실행 + 파일 다운로드/저장 ---
-            try:
-                res = run_lda_from_csv(upload_path, job_dir, extra_instruction=extra)
-                answer = res.answer_text
-                files = res.saved_relpaths or []
-                images = [p for p in files if p.lower().endswith((".png", ".jpg", ".jpeg", ".gif", ".webp"))]
-
-                # 파일이 하나도 없으면 사용자에게 원인을 힌트로 제공
-                if not files:
-                    answer = (answer or "").strip() or "[안내] 결과 파일이 생성되지 않았습니다. 프롬프트/도구 실행 실패 가능성이 있어 서버 로그를 확인하세요."
-            except Exception as e:
-                answer = f"[오류] {e}"
+                shutil.copyfileobj(f, out, length=1024 * 1024)
+
+            # 작은 CSV는 batch_id 없이 대기 상태로 저장하면 poll_lda_batches가 로컬 gensim으로 실행
+            # (수십 초 걸리는 LDA로 요청 스레드/gunicorn 워커를 붙잡지 않음)
+            if not should_run_lda_locally(upload_path):
+                # --- OpenAI Batch 제출: 결과는 poll_lda_batches가 수집 ---
+                try:
+                    job.batch_id = submit_lda_batch(upload_path, job_dir, extra_instruction=extra)
+                except Exception as e:
+                    job.status = LDAJob.STATUS_FAILED
+                    job.answer_text = f"[오류] {e}"
+            job.save()
+            return redirect(job)
 
         ctx = self.get_context_data(
             form=form,
@@ -140,6 +149,72 @@ class ToolDetailView(FormMixin, generic.DetailView):
         return self.render_to_response(ctx)
 
 
+class LDAJobDetailView(generic.DetailView):
+    """
+    LDA 작업(batch 제출 또는 로컬 실행) 상태/결과 페이지.
+    대기 중이면 템플릿이 주기적으로 새로고침합니다.
+    """
+    model = LDAJob
+    context_object_name = "job"
+    template_name = "catalog/ldajob_detail.html"
+    pk_url_kwarg = "job_pk"
+
+    def get_queryset(self):
+        return LDAJob.objects.select_related("tool").filter(tool_id=self.kwargs["pk"])
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        files = self.object.saved_relpaths or []
+        ctx["tool"] = self.object.tool
+        ctx["files"] = files
+        ctx["images"] = [p for p in files if p.lower().endswith((".png", ".jpg", ".jpeg", ".gif", ".webp"))]
+        return ctx
+
+
+def ask_stream(request, pk):
+    """
+    GET ?q=질문 → Server-Sent Events로 답변 토큰을 흘려보냅니다.
+    프레임 형식: data: {"delta": "..."} / 종료 시 data: {"done": true}
+    """
+    get_object_or_404(ToolList, pk=pk)
+    question = (request.GET.get("q") or "").strip()
+    if not question:
+        return HttpResponseBadRequest("q 파라미터가 필요합니다.")
+
+    def events():
+        try:
+            for delta in stream_answer(question):
+                yield f"data: {json.dumps({'delta': delta}, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'error': str(e)}, ensure_ascii=False)}\n\n"
+        yield f"data: {json.dumps({'done': True})}\n\n"
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def lda_artifact(request, relpath):
+    """
+    LDA 결과 파일 다운로드.
+    settings.LDA_ARTIFACT_ACCEL_PREFIX가 있으면 X-Accel-Redirect로 nginx에 전송을 넘기고
+    (Python 워커를 파일 전송에 붙잡아 두지 않음), 없으면(개발 환경) 직접 FileResponse로 보냅니다.
+    """
+    root = media_root()
+    path = (root / relpath).resolve()
+    # resolve한 뒤에 검사해야 lda_results/../ 같은 경로로 결과 디렉터리 밖을 가리킬 수 없음
+    if (root / "lda_results") not in path.parents or not path.is_file():
+        raise Http404("결과 파일이 없습니다.")
+
+    accel_prefix = getattr(settings, "LDA_ARTIFACT_ACCEL_PREFIX", None)
+    if accel_prefix:
+        response = HttpResponse(content_type="")
+        response["X-Accel-Redirect"] = quote(f"{accel_prefix.rstrip('/')}/{path.relative_to(root).as_posix()}")
+        return response
+    return FileResponse(path.open("rb"))
+
+
 # (기존 urls.py가 function-based view를 쓰는 경우를 대비한 호환용)
 # path("tools/<int:primary_key>/", views.tool_detail_view, ...) 같은 라우팅이 있어도 동작합니다.
 def tool_detail_view(request, primary_key):
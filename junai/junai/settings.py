@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -18,6 +19,14 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# LDA 결과 파일을 nginx가 직접 보내도록 X-Accel-Redirect로 넘길 내부 경로(None이면 Django가 직접 전송)
+# nginx 예시:
+#   location /media/protected/ { internal; alias /var/app/media/; }
+LDA_ARTIFACT_ACCEL_PREFIX = os.getenv("LDA_ARTIFACT_ACCEL_PREFIX") or None
+
+# 5MB 이하 업로드는 임시파일 없이 메모리(InMemoryUploadedFile)로 처리
+FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -29,6 +38,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# 워커 프로세스별 첫 요청 때 OpenAI 커넥션(DNS/TLS)을 미리 열어 이후 요청 지연을 줄임
+OPENAI_WARMUP = os.getenv("OPENAI_WARMUP", "0" if DEBUG else "1") == "1"
+
 
 # Application definition
 
@@ -54,7 +66,6 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'junai.urls'
 
-import os
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',